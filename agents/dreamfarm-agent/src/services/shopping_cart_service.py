@@ -3,16 +3,22 @@
 User-bound shopping cart with stock validation and random pricing.
 """
 
+import asyncio
 import logging
 import os
-import random
-from decimal import Decimal
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 from uuid import UUID
 
 import httpx
+import orjson
 import psycopg
-from psycopg.rows import dict_row
+from psycopg import sql
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
 
 from src.services.config_service import AppConfig
 
@@ -34,6 +40,66 @@ PRICE_RANGES = {
 }
 DEFAULT_PRICE_RANGE = (2.0, 10.0)
 
+# Price ranges precomputed as (min, span), so a price is min + random() * span
+_PRICE_SPANS = {
+    category: (min_price, max_price - min_price)
+    for category, (min_price, max_price) in PRICE_RANGES.items()
+}
+_DEFAULT_PRICE_SPAN = (DEFAULT_PRICE_RANGE[0], DEFAULT_PRICE_RANGE[1] - DEFAULT_PRICE_RANGE[0])
+
+# _PRICE_SPANS as a SQL VALUES list, so prices are generated by the INSERT
+_PRICE_SPANS_SQL = sql.SQL(", ").join(
+    sql.SQL("({}, {}::numeric, {}::numeric)").format(
+        sql.Literal(category), sql.Literal(min_price), sql.Literal(span)
+    )
+    for category, (min_price, span) in _PRICE_SPANS.items()
+)
+
+# Resolved product lookups (product name -> product row)
+PRODUCT_CACHE_SIZE = 10_000
+PRODUCT_CACHE_TTL = 60.0  # seconds
+
+# Stock API responses (product ID -> stock quantity)
+STOCK_CACHE_SIZE = 10_000
+STOCK_CACHE_TTL = 0.5  # seconds
+
+# Accepted values of the STOCK_SOURCE environment variable
+STOCK_SOURCES = ("api", "postgres")
+
+
+class _TTLCache:
+    """Small in-process LRU cache with per-entry time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """Initialize cache.
+
+        Args:
+            maxsize: Maximum number of entries, least recently used are evicted
+            ttl: Entry lifetime in seconds
+        """
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any) -> Any | None:
+        """Get cached value, None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any):
+        """Store value, evicting the least recently used entry when full."""
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
 
 class ShoppingCartService:
     """Service for managing user shopping carts."""
@@ -47,7 +113,25 @@ class ShoppingCartService:
         """
         self._config = config
         self._stock_api_url = stock_api_url.rstrip("/")
-        self._http_client = httpx.AsyncClient(timeout=10.0)
+        # Keep-alive pool sized for bursts of stock lookups, so repeated
+        # calls reuse open connections instead of reconnecting
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=2.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=40,
+                keepalive_expiry=30.0,
+            ),
+        )
+
+        # Where get_cart reads stock from: "api" (stock API over HTTP) or
+        # "postgres" (stock table joined in SQL, see create_stock_fdw.sql)
+        self._stock_source = os.getenv("STOCK_SOURCE", "api")
+        if self._stock_source not in STOCK_SOURCES:
+            raise ValueError(
+                f"Invalid STOCK_SOURCE {self._stock_source!r}, "
+                f"expected one of: {', '.join(STOCK_SOURCES)}"
+            )
 
         # Build PostgreSQL connection string from environment variables
         db_host = os.getenv("PGHOST", "localhost")
@@ -61,104 +145,224 @@ class ShoppingCartService:
             f"@{db_host}:{db_port}/{db_name}"
         )
         logger.info(
-            "Initialized ShoppingCartService (stock_api=%s, db=%s@%s:%s)",
+            "Initialized ShoppingCartService (stock_api=%s, stock_source=%s, db=%s@%s:%s)",
             self._stock_api_url,
+            self._stock_source,
             db_name,
             db_host,
             db_port,
         )
 
+        # Shared connection pool; opened lazily on first use since the
+        # service is constructed outside of a running event loop.
+        # prepare_threshold=0 prepares every query on first use, so the hot
+        # product match and item upsert are parsed and planned once per
+        # connection.
+        self._pool = AsyncConnectionPool(
+            self._db_url,
+            min_size=4,
+            max_size=20,
+            kwargs={"row_factory": dict_row, "prepare_threshold": 0},
+            open=False,
+        )
+
+        # Product lookups keyed by (name, VIP access, filters). Nothing in the
+        # service changes the catalog, so entries expire only via the TTL.
+        self._product_cache = _TTLCache(PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL)
+
+        # Short-lived stock quantities, collapses repeated lookups of the same
+        # product within one cart operation
+        self._stock_cache = _TTLCache(STOCK_CACHE_SIZE, STOCK_CACHE_TTL)
+
+    async def open(self):
+        """Open database connection pool."""
+        await self._pool.open()
+
     async def close(self):
-        """Close HTTP client."""
+        """Close HTTP client and database connection pool."""
         await self._http_client.aclose()
+        await self._pool.close()
 
-    def _generate_price(self, category: str | None) -> Decimal:
-        """Generate random price based on product category.
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[psycopg.AsyncConnection]:
+        """Borrow a connection from the pool, opening the pool if needed."""
+        if self._pool.closed:
+            await self._pool.open()
+        async with self._pool.connection() as conn:
+            yield conn
+
+    async def _get_stock_quantity(self, product_id: UUID) -> int:
+        """Get current stock quantity for a product.
 
         Args:
-            category: Product category (e.g., "Vegetables", "Fruits")
+            product_id: UUID of the product
 
         Returns:
-            Random price as Decimal with 2 decimal places
+            Current stock quantity (0 if not available or error)
         """
-        min_price, max_price = PRICE_RANGES.get(category or "", DEFAULT_PRICE_RANGE)
-        price = random.uniform(min_price, max_price)
-        return Decimal(str(round(price, 2)))
+        stock = await self._get_stock_quantities([product_id])
+        return stock.get(str(product_id), 0)
 
-    async def _get_stock_quantity(self, product_id: UUID) -> int:
-        """Get current stock quantity for a product.
+    async def _get_stock_quantities(self, product_ids: list[UUID]) -> dict[str, int]:
+        """Get current stock quantities for several products in one request.
+
+        Quantities fetched within the last STOCK_CACHE_TTL seconds are served
+        from cache; only the remaining products are requested.
 
         Args:
-            product_id: UUID of the product
+            product_ids: UUIDs of the products
 
         Returns:
-            Current stock quantity (0 if not available or error)
+            Dict mapping product ID string to stock quantity; products missing
+            from the response or failed to fetch are omitted
         """
+        stock: dict[str, int] = {}
+        missing = []
+        for product_id in dict.fromkeys(str(product_id) for product_id in product_ids):
+            quantity = self._stock_cache.get(product_id)
+            if quantity is None:
+                missing.append(product_id)
+            else:
+                stock[product_id] = quantity
+
+        if not missing:
+            return stock
+
         try:
             url = f"{self._stock_api_url}/stock"
-            payload = {"productIds": [str(product_id)]}
+            payload = {"productIds": missing}
             response = await self._http_client.post(url, json=payload)
             response.raise_for_status()
-            data = response.json()
-            items = data.get("items", [])
-            if items:
-                return items[0].get("onStock", 0)
-            return 0
+            data = orjson.loads(response.content)
+            for item in data.get("items", []):
+                quantity = item.get("onStock", 0)
+                stock[item["productId"]] = quantity
+                self._stock_cache.set(item["productId"], quantity)
         except Exception as e:
-            logger.warning("Failed to get stock for product %s: %s", product_id, e)
-            return 0
+            logger.warning("Failed to get stock for products %s: %s", missing, e)
+        return stock
 
-    async def _search_product(
+    async def _search_products(
         self,
-        product_name: str,
+        items: list[dict[str, Any]],
         user_is_vip: bool,
-        category: str | None = None,
-        is_organic: bool | None = None,
-    ) -> dict[str, Any] | None:
-        """Search for a product by name with optional filters.
+    ) -> list[dict[str, Any] | None]:
+        """Search for products by name for a batch of cart items.
 
-        Uses PostgreSQL SIMILARITY function for fuzzy matching.
+        Uses the pg_trgm similarity operator (%) for fuzzy matching, which
+        unlike a SIMILARITY(...) > 0.3 filter can be served by the trigram GIN
+        index on products.product_name. All names are sent as a single array
+        and matched with one LATERAL lookup, so the whole batch costs one
+        round-trip. Recently resolved names are served from the product cache
+        without touching the database.
 
         Args:
-            product_name: Product name to search for
+            items: List of items, each with:
+                - product_name: str (required)
+                - category: str (optional filter)
+                - is_organic: bool (optional filter)
             user_is_vip: Whether user has VIP access
-            category: Optional category filter
-            is_organic: Optional organic filter
 
         Returns:
-            Product dict with keys: product_id, product_name, category, is_organic
-            None if no match found
+            List aligned with ``items``; each entry is a product dict with keys
+            product_id, product_name, category, is_organic, or None if no match
+            was found
         """
-        async with await psycopg.AsyncConnection.connect(
-            self._db_url, row_factory=dict_row
-        ) as conn:
-            async with conn.cursor() as cur:
-                # Build query with VIP fencing (simplified - no categories table)
-                query = """
-                    SELECT
-                        product_id,
-                        product_name,
-                        'Unknown' AS category,
-                        false AS is_organic,
-                        SIMILARITY(product_name, %s) AS sim
-                    FROM products
-                    WHERE (is_vip = false OR %s = true)
-                      AND SIMILARITY(product_name, %s) > 0.3
-                    ORDER BY sim DESC
-                    LIMIT 1
-                """
-                params: list[Any] = [product_name, user_is_vip, product_name]
-
+        results: list[dict[str, Any] | None] = [None] * len(items)
+        keys = [
+            (
+                item["product_name"].lower(),
+                user_is_vip,
+                item.get("category"),
+                item.get("is_organic"),
+            )
+            for item in items
+        ]
+        misses = []
+        for idx, key in enumerate(keys):
+            product = self._product_cache.get(key)
+            if product is None:
+                misses.append(idx)
+            else:
+                results[idx] = product
+
+        if not misses:
+            return results
+
+        # Build query with VIP fencing (simplified - no categories table)
+        query = """
+            SELECT
+                req.idx,
+                m.product_id,
+                m.product_name,
+                m.category,
+                m.is_organic,
+                m.sim
+            FROM UNNEST(%s::int[], %s::text[]) AS req(idx, name)
+            CROSS JOIN LATERAL (
+                SELECT
+                    p.product_id,
+                    p.product_name,
+                    'Unknown' AS category,
+                    false AS is_organic,
+                    SIMILARITY(p.product_name, req.name) AS sim
+                FROM products p
+                WHERE (p.is_vip = false OR %s = true)
+                  AND p.product_name %% req.name
+                ORDER BY p.product_name <-> req.name
+                LIMIT 1
+            ) m
+        """
+        params: list[Any] = [
+            misses,
+            [items[idx]["product_name"] for idx in misses],
+            user_is_vip,
+        ]
+
+        async with self._connection() as conn:
+            # Pipelined, so setting the threshold costs no extra round-trip
+            async with conn.pipeline(), conn.cursor(row_factory=tuple_row) as cur:
+                # Threshold used by the % operator, scoped to this transaction
+                await cur.execute("SET LOCAL pg_trgm.similarity_threshold = 0.3")
                 await cur.execute(query, params)
-                result = await cur.fetchone()
+                rows = await cur.fetchall()
 
-                if result:
-                    logger.info(
-                        "Found product: %s (similarity=%.2f)",
-                        result["product_name"],
-                        result["sim"],
-                    )
-                return result
+        for idx, product_id, product_name, category, is_organic, sim in rows:
+            logger.info("Found product: %s (similarity=%.2f)", product_name, sim)
+            product = {
+                "product_id": product_id,
+                "product_name": product_name,
+                "category": category,
+                "is_organic": is_organic,
+            }
+            results[idx] = product
+            self._product_cache.set(keys[idx], product)
+        return results
+
+    async def _ensure_cart(self, user_id: str) -> UUID | None:
+        """Get ID of user's cart, creating the cart if it does not exist.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Cart UUID, None if the cart could not be created
+        """
+        async with self._connection() as conn:
+            async with conn.cursor(row_factory=tuple_row) as cur:
+                await cur.execute(
+                    """
+                    INSERT INTO shopping_carts (user_id, created_at, updated_at)
+                    VALUES (%s, NOW(), NOW())
+                    ON CONFLICT (user_id) DO UPDATE SET updated_at = NOW()
+                    RETURNING id
+                    """,
+                    (user_id,),
+                )
+                cart_result = await cur.fetchone()
+                await conn.commit()
+
+        return cart_result[0] if cart_result else None
 
     async def add_to_cart(
         self,
@@ -185,66 +389,80 @@ class ShoppingCartService:
                 - cart_total: float (total cart value)
                 - total_items: int (total number of items in cart)
         """
-        added_items = []
-        failed_items = []
-
-        async with await psycopg.AsyncConnection.connect(self._db_url) as conn:
-            async with conn.cursor() as cur:
-                # Ensure cart exists for user
-                await cur.execute(
-                    """
-                    INSERT INTO shopping_carts (user_id, created_at, updated_at)
-                    VALUES (%s, NOW(), NOW())
-                    ON CONFLICT (user_id) DO UPDATE SET updated_at = NOW()
-                    RETURNING id
-                    """,
-                    (user_id,),
+        # Results are collected per input position, so added_items and
+        # failed_items keep the order of the requested items
+        added_slots: list[list[dict[str, Any]]] = [[] for _ in items]
+        failed_slots: list[list[dict[str, Any]]] = [[] for _ in items]
+
+        # Validate items up front so only well-formed ones hit the database
+        valid_items = []
+        for position, item in enumerate(items):
+            product_name = item.get("product_name", "").strip()
+            quantity = item.get("quantity", 1)
+
+            if not product_name:
+                failed_slots[position].append(
+                    {
+                        "product_name": product_name,
+                        "error": "Product name is required",
+                    }
                 )
-                cart_result = await cur.fetchone()
-                cart_id = cart_result[0] if cart_result else None
-
-                if not cart_id:
-                    return {
-                        "success": False,
-                        "error": "Failed to create or retrieve cart",
-                        "added_items": [],
-                        "failed_items": items,
+                continue
+
+            if quantity <= 0:
+                failed_slots[position].append(
+                    {
+                        "product_name": product_name,
+                        "error": "Quantity must be positive",
                     }
+                )
+                continue
+
+            valid_items.append(
+                {
+                    "position": position,
+                    "product_name": product_name,
+                    "quantity": quantity,
+                    "category": item.get("category"),
+                    "is_organic": item.get("is_organic"),
+                }
+            )
 
-                # Process each item
-                for item in items:
-                    product_name = item.get("product_name", "").strip()
-                    quantity = item.get("quantity", 1)
-                    category_filter = item.get("category")
-                    is_organic_filter = item.get("is_organic")
+        # Ensure cart exists for user and search for all products concurrently,
+        # each on its own pooled connection
+        cart_id, products = await asyncio.gather(
+            self._ensure_cart(user_id),
+            self._search_products(valid_items, user_is_vip),
+        )
 
-                    if not product_name:
-                        failed_items.append(
-                            {
-                                "product_name": product_name,
-                                "error": "Product name is required",
-                            }
-                        )
-                        continue
+        if not cart_id:
+            return {
+                "success": False,
+                "error": "Failed to create or retrieve cart",
+                "added_items": [],
+                "failed_items": items,
+            }
+
+        # Check stock availability of all matched products in one request
+        stock_by_id = await self._get_stock_quantities(
+            list({product["product_id"] for product in products if product})
+        )
 
-                    if quantity <= 0:
-                        failed_items.append(
-                            {
-                                "product_name": product_name,
-                                "error": "Quantity must be positive",
-                            }
-                        )
-                        continue
+        async with self._connection() as conn:
+            async with conn.cursor() as cur:
+                # Requested quantities merged per product, so a product asked
+                # for twice is written once (ON CONFLICT cannot touch a row
+                # twice within the same statement)
+                pending: dict[UUID, dict[str, Any]] = {}
 
-                    # Search for product
-                    product = await self._search_product(
-                        product_name, user_is_vip, category_filter, is_organic_filter
-                    )
+                for item, product in zip(valid_items, products):
+                    position = item["position"]
+                    quantity = item["quantity"]
 
                     if not product:
-                        failed_items.append(
+                        failed_slots[position].append(
                             {
-                                "product_name": product_name,
+                                "product_name": item["product_name"],
                                 "error": "Product not found",
                                 "requested_quantity": quantity,
                             }
@@ -252,11 +470,9 @@ class ShoppingCartService:
                         continue
 
                     product_id = product["product_id"]
-
-                    # Check stock availability
-                    available_stock = await self._get_stock_quantity(product_id)
+                    available_stock = stock_by_id.get(str(product_id), 0)
                     if quantity > available_stock:
-                        failed_items.append(
+                        failed_slots[position].append(
                             {
                                 "product_name": product["product_name"],
                                 "product_id": str(product_id),
@@ -267,70 +483,180 @@ class ShoppingCartService:
                         )
                         continue
 
-                    # Generate price (only on first add)
-                    unit_price = self._generate_price(product.get("category"))
-
-                    # Add or update cart item
-                    await cur.execute(
-                        """
-                        INSERT INTO shopping_cart_items
-                            (cart_id, product_id, quantity, unit_price, added_at, updated_at)
-                        VALUES (%s, %s, %s, %s, NOW(), NOW())
-                        ON CONFLICT (cart_id, product_id)
-                        DO UPDATE SET
-                            quantity = shopping_cart_items.quantity + EXCLUDED.quantity,
-                            updated_at = NOW()
-                        RETURNING quantity, unit_price
-                        """,
-                        (cart_id, product_id, quantity, unit_price),
-                    )
-                    result = await cur.fetchone()
-                    final_quantity = result[0] if result else quantity
-                    final_price = result[1] if result else unit_price
-
-                    # Re-check stock after potential increment
-                    if final_quantity > available_stock:
-                        # Rollback this item (set to available stock)
-                        await cur.execute(
-                            """
-                            UPDATE shopping_cart_items
-                            SET quantity = %s, updated_at = NOW()
-                            WHERE cart_id = %s AND product_id = %s
-                            """,
-                            (available_stock, cart_id, product_id),
-                        )
-                        failed_items.append(
-                            {
-                                "product_name": product["product_name"],
-                                "product_id": str(product_id),
-                                "requested_quantity": quantity,
-                                "available_stock": available_stock,
-                                "error": f"Reduced quantity to available stock ({available_stock})",
-                            }
-                        )
-                        final_quantity = available_stock
-
-                    added_items.append(
-                        {
-                            "product_id": str(product_id),
-                            "product_name": product["product_name"],
-                            "quantity": quantity,
-                            "unit_price": float(final_price),
-                            "total_price": float(final_price * final_quantity),
+                    entry = pending.get(product_id)
+                    if not entry:
+                        entry = pending[product_id] = {
+                            "product": product,
+                            "available_stock": available_stock,
+                            "positions": [],
+                            "quantities": [],
                         }
+                    entry["positions"].append(position)
+                    entry["quantities"].append(quantity)
+
+                if pending:
+                    # Add or update all cart items in one statement. Random
+                    # price by category is generated on first add only, and
+                    # quantities are clamped to available stock on the server;
+                    # prev holds quantities from before the upsert, so rows
+                    # that had to be reduced can be reported.
+                    query = sql.SQL(
+                        """
+                        WITH
+                            price_spans(category, min_price, span) AS (
+                                VALUES {price_spans}
+                            ),
+                            req AS (
+                                SELECT *
+                                FROM UNNEST(%s::uuid[], %s::int[], %s::text[], %s::int[])
+                                    AS t(product_id, quantity, category, available_stock)
+                            ),
+                            prev AS (
+                                SELECT product_id, quantity
+                                FROM shopping_cart_items
+                                WHERE cart_id = %s
+                                  AND product_id IN (SELECT product_id FROM req)
+                            ),
+                            ins AS (
+                                INSERT INTO shopping_cart_items
+                                    (cart_id, product_id, quantity, unit_price, added_at, updated_at)
+                                SELECT
+                                    %s,
+                                    req.product_id,
+                                    LEAST(req.quantity, req.available_stock),
+                                    ROUND(
+                                        COALESCE(ps.min_price, {default_min})
+                                        + random()::numeric * COALESCE(ps.span, {default_span}),
+                                        2
+                                    ),
+                                    NOW(),
+                                    NOW()
+                                FROM req
+                                LEFT JOIN price_spans ps ON ps.category = req.category
+                                ON CONFLICT (cart_id, product_id)
+                                DO UPDATE SET
+                                    quantity = LEAST(
+                                        shopping_cart_items.quantity + EXCLUDED.quantity,
+                                        (
+                                            SELECT req.available_stock
+                                            FROM req
+                                            WHERE req.product_id = EXCLUDED.product_id
+                                        )
+                                    ),
+                                    updated_at = NOW()
+                                RETURNING product_id, quantity, unit_price
+                            )
+                        SELECT
+                            ins.product_id,
+                            ins.quantity,
+                            ins.unit_price,
+                            COALESCE(prev.quantity, 0) + req.quantity > ins.quantity AS reduced
+                        FROM ins
+                        JOIN req ON req.product_id = ins.product_id
+                        LEFT JOIN prev ON prev.product_id = ins.product_id
+                        """
+                    ).format(
+                        price_spans=_PRICE_SPANS_SQL,
+                        default_min=sql.SQL("{}::numeric").format(
+                            sql.Literal(_DEFAULT_PRICE_SPAN[0])
+                        ),
+                        default_span=sql.SQL("{}::numeric").format(
+                            sql.Literal(_DEFAULT_PRICE_SPAN[1])
+                        ),
                     )
+                    # One array per column instead of one bound row per item
+                    params: list[Any] = [
+                        list(pending),
+                        [sum(entry["quantities"]) for entry in pending.values()],
+                        [entry["product"].get("category") for entry in pending.values()],
+                        [entry["available_stock"] for entry in pending.values()],
+                        cart_id,
+                        cart_id,
+                    ]
+                    # Upsert and cart totals are sent back-to-back in one
+                    # pipeline; totals are computed within the same
+                    # transaction, after the upsert
+                    async with conn.pipeline():
+                        await cur.execute(query, params)
+                        async with conn.cursor() as totals_cur:
+                            totals = await self._fetch_cart_totals(totals_cur, user_id)
+                        final = {row["product_id"]: row for row in await cur.fetchall()}
+
+                    for product_id, entry in pending.items():
+                        row = final[product_id]
+                        product = entry["product"]
+
+                        # Reported at the last item of the product, where the
+                        # merged quantity exceeded stock
+                        if row["reduced"]:
+                            available_stock = entry["available_stock"]
+                            failed_slots[entry["positions"][-1]].append(
+                                {
+                                    "product_name": product["product_name"],
+                                    "product_id": str(product_id),
+                                    "requested_quantity": sum(entry["quantities"]),
+                                    "available_stock": available_stock,
+                                    "error": f"Reduced quantity to available stock ({available_stock})",
+                                }
+                            )
+
+                        for position, quantity in zip(
+                            entry["positions"], entry["quantities"]
+                        ):
+                            added_slots[position].append(
+                                {
+                                    "product_id": str(product_id),
+                                    "product_name": product["product_name"],
+                                    "quantity": quantity,
+                                    "unit_price": float(row["unit_price"]),
+                                    "total_price": float(row["unit_price"] * row["quantity"]),
+                                }
+                            )
+                else:
+                    totals = await self._fetch_cart_totals(cur, user_id)
 
                 await conn.commit()
 
-        # Get cart totals
-        cart_summary = await self.get_cart(user_id)
+        added_items = [added for slot in added_slots for added in slot]
+        failed_items = [failed for slot in failed_slots for failed in slot]
 
         return {
             "success": len(failed_items) == 0,
             "added_items": added_items,
             "failed_items": failed_items,
-            "cart_total": cart_summary.get("total_price", 0.0),
-            "total_items": cart_summary.get("total_items", 0),
+            "cart_total": totals["total_price"],
+            "total_items": totals["total_items"],
+        }
+
+    async def _fetch_cart_totals(
+        self, cur: psycopg.AsyncCursor, user_id: str
+    ) -> dict[str, Any]:
+        """Compute cart totals with a SQL aggregate.
+
+        Args:
+            cur: Cursor of an open connection
+            user_id: User ID
+
+        Returns:
+            Dict with:
+                - total_items: int (total quantity across all products)
+                - total_price: float
+        """
+        await cur.execute(
+            """
+            SELECT
+                COALESCE(SUM(sci.quantity), 0) AS total_items,
+                COALESCE(SUM(sci.quantity * sci.unit_price), 0) AS total_price
+            FROM shopping_carts sc
+            JOIN shopping_cart_items sci ON sci.cart_id = sc.id
+            WHERE sc.user_id = %s
+            """,
+            (user_id,),
+        )
+        totals = await cur.fetchone()
+        return {
+            "total_items": int(totals["total_items"]),
+            "total_price": float(totals["total_price"]),
         }
 
     async def get_cart(self, user_id: str) -> dict[str, Any]:
@@ -346,58 +672,75 @@ class ShoppingCartService:
                 - total_price: float
                 - currency: str ("EUR")
         """
-        async with await psycopg.AsyncConnection.connect(
-            self._db_url, row_factory=dict_row
-        ) as conn:
+        # Cart totals are window aggregates over the same rows, so they always
+        # match the returned items. Stock comes either from the stock table
+        # joined in the query or from the stock API in one request.
+        stock_in_db = self._stock_source == "postgres"
+        query = sql.SQL(
+            """
+            SELECT
+                sci.product_id,
+                p.product_name,
+                sci.quantity,
+                sci.unit_price,
+                (sci.quantity * sci.unit_price) AS total_price,
+                sci.added_at,
+                sci.updated_at,
+                SUM(sci.quantity) OVER () AS cart_total_items,
+                SUM(sci.quantity * sci.unit_price) OVER () AS cart_total_price{stock_column}
+            FROM shopping_carts sc
+            JOIN shopping_cart_items sci ON sci.cart_id = sc.id
+            JOIN products p ON p.product_id = sci.product_id{stock_join}
+            WHERE sc.user_id = %s
+            ORDER BY sci.added_at DESC
+            """
+        ).format(
+            stock_column=sql.SQL(
+                ", COALESCE(s.on_stock, 0) AS available_stock" if stock_in_db else ""
+            ),
+            stock_join=sql.SQL(
+                " LEFT JOIN stock s ON s.product_id = sci.product_id"
+                if stock_in_db
+                else ""
+            ),
+        )
+
+        async with self._connection() as conn:
             async with conn.cursor() as cur:
-                await cur.execute(
-                    """
-                    SELECT
-                        sci.product_id,
-                        p.product_name,
-                        sci.quantity,
-                        sci.unit_price,
-                        (sci.quantity * sci.unit_price) AS total_price,
-                        sci.added_at,
-                        sci.updated_at
-                    FROM shopping_carts sc
-                    JOIN shopping_cart_items sci ON sci.cart_id = sc.id
-                    JOIN products p ON p.product_id = sci.product_id
-                    WHERE sc.user_id = %s
-                    ORDER BY sci.added_at DESC
-                    """,
-                    (user_id,),
-                )
+                await cur.execute(query, (user_id,))
                 rows = await cur.fetchall()
 
-                items = []
-                total_items = 0
-                total_price = Decimal(0)
-
-                for row in rows:
-                    # Get current stock for each item
-                    stock = await self._get_stock_quantity(row["product_id"])
-
-                    item = {
-                        "product_id": str(row["product_id"]),
-                        "product_name": row["product_name"],
-                        "quantity": row["quantity"],
-                        "unit_price": float(row["unit_price"]),
-                        "total_price": float(row["total_price"]),
-                        "available_stock": stock,
-                        "added_at": row["added_at"].isoformat(),
-                        "updated_at": row["updated_at"].isoformat(),
-                    }
-                    items.append(item)
-                    total_items += row["quantity"]
-                    total_price += row["total_price"]
+        # The connection is back in the pool before waiting on the stock API
+        if not stock_in_db:
+            stock_by_id = await self._get_stock_quantities(
+                [row["product_id"] for row in rows]
+            )
+
+        items = []
+        for row in rows:
+            if stock_in_db:
+                stock = row["available_stock"]
+            else:
+                stock = stock_by_id.get(str(row["product_id"]), 0)
+
+            item = {
+                "product_id": str(row["product_id"]),
+                "product_name": row["product_name"],
+                "quantity": row["quantity"],
+                "unit_price": float(row["unit_price"]),
+                "total_price": float(row["total_price"]),
+                "available_stock": stock,
+                "added_at": row["added_at"].isoformat(),
+                "updated_at": row["updated_at"].isoformat(),
+            }
+            items.append(item)
 
-                return {
-                    "items": items,
-                    "total_items": total_items,
-                    "total_price": float(total_price),
-                    "currency": "EUR",
-                }
+        return {
+            "items": items,
+            "total_items": int(rows[0]["cart_total_items"]) if rows else 0,
+            "total_price": float(rows[0]["cart_total_price"]) if rows else 0.0,
+            "currency": "EUR",
+        }
 
     async def update_cart_item(
         self, user_id: str, product_id: str, quantity: int
@@ -430,8 +773,8 @@ class ShoppingCartService:
                     "available_stock": available_stock,
                 }
 
-        async with await psycopg.AsyncConnection.connect(self._db_url) as conn:
-            async with conn.cursor() as cur:
+        async with self._connection() as conn:
+            async with conn.cursor(row_factory=tuple_row) as cur:
                 # Get cart_id
                 await cur.execute(
                     "SELECT id FROM shopping_carts WHERE user_id = %s", (user_id,)
@@ -440,7 +783,7 @@ class ShoppingCartService:
                 if not cart_result:
                     return {"success": False, "error": "Cart not found"}
 
-                cart_id = cart_result[0]
+                (cart_id,) = cart_result
 
                 if quantity == 0:
                     # Remove item
@@ -475,9 +818,44 @@ class ShoppingCartService:
             product_id: Product UUID
 
         Returns:
-            Dict with success status and cart summary
+            Dict with:
+                - success: bool
+                - removed: bool (whether the product was in the cart)
+                - cart_total: float (total cart value)
+                - total_items: int (total number of items in cart)
         """
-        return await self.update_cart_item(user_id, product_id, 0)
+        try:
+            product_uuid = UUID(product_id)
+        except ValueError:
+            return {"success": False, "error": "Invalid product ID"}
+
+        async with self._connection() as conn:
+            async with conn.cursor() as cur:
+                # Delete and cart totals are sent back-to-back in one pipeline
+                async with conn.pipeline():
+                    await cur.execute(
+                        """
+                        DELETE FROM shopping_cart_items sci
+                        USING shopping_carts sc
+                        WHERE sci.cart_id = sc.id
+                          AND sc.user_id = %s
+                          AND sci.product_id = %s
+                        RETURNING 1
+                        """,
+                        (user_id, product_uuid),
+                    )
+                    async with conn.cursor() as totals_cur:
+                        totals = await self._fetch_cart_totals(totals_cur, user_id)
+                    removed = await cur.fetchone() is not None
+
+                await conn.commit()
+
+        return {
+            "success": True,
+            "removed": removed,
+            "cart_total": totals["total_price"],
+            "total_items": totals["total_items"],
+        }
 
     async def clear_cart(self, user_id: str) -> dict[str, Any]:
         """Remove all items from cart.
@@ -486,19 +864,23 @@ class ShoppingCartService:
             user_id: User ID
 
         Returns:
-            Dict with success status
+            Dict with success status and number of removed cart items
         """
-        async with await psycopg.AsyncConnection.connect(self._db_url) as conn:
-            async with conn.cursor() as cur:
+        async with self._connection() as conn:
+            async with conn.cursor(row_factory=tuple_row) as cur:
                 await cur.execute(
                     """
-                    DELETE FROM shopping_cart_items
-                    WHERE cart_id IN (
-                        SELECT id FROM shopping_carts WHERE user_id = %s
+                    WITH del AS (
+                        DELETE FROM shopping_cart_items sci
+                        USING shopping_carts sc
+                        WHERE sci.cart_id = sc.id AND sc.user_id = %s
+                        RETURNING 1
                     )
+                    SELECT COUNT(*) FROM del
                     """,
                     (user_id,),
                 )
+                (removed_items,) = await cur.fetchone()
                 await conn.commit()
 
-        return {"success": True, "message": "Cart cleared"}
+        return {"success": True, "message": "Cart cleared", "removed_items": removed_items}
@@ -10,8 +10,9 @@ CREATE TABLE IF NOT EXISTS shopping_carts (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
--- Index for fast user lookup
-CREATE INDEX IF NOT EXISTS idx_shopping_carts_user_id ON shopping_carts(user_id);
+-- Fast user lookup and ON CONFLICT (user_id) are served by the unique index
+-- behind the UNIQUE constraint; a separate index would only duplicate it
+DROP INDEX IF EXISTS idx_shopping_carts_user_id;
 
 -- Shopping cart items (products in cart)
 CREATE TABLE IF NOT EXISTS shopping_cart_items (
@@ -27,9 +28,20 @@ CREATE TABLE IF NOT EXISTS shopping_cart_items (
 );
 
 -- Indexes for performance
-CREATE INDEX IF NOT EXISTS idx_cart_items_cart_id ON shopping_cart_items(cart_id);
+-- UNIQUE(cart_id, product_id) backs ON CONFLICT (cart_id, product_id) and
+-- lookups by cart_id. The covering index returns cart contents in added_at
+-- order with an index-only scan.
+DROP INDEX IF EXISTS idx_cart_items_cart_id;
+CREATE INDEX IF NOT EXISTS idx_cart_items_cart_added
+    ON shopping_cart_items(cart_id, added_at DESC)
+    INCLUDE (product_id, quantity, unit_price, updated_at);
 CREATE INDEX IF NOT EXISTS idx_cart_items_product_id ON shopping_cart_items(product_id);
 
+-- Trigram index for fuzzy product matching (product_name % 'query')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm
+    ON products USING GIN (product_name gin_trgm_ops);
+
 -- Trigger to update updated_at timestamp on shopping_carts
 CREATE OR REPLACE FUNCTION update_shopping_cart_timestamp()
 RETURNS TRIGGER AS $$
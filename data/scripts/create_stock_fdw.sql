@@ -0,0 +1,40 @@
+-- Stock table for DreamFarm Agent shopping cart (optional)
+-- Purpose: Let get_cart join live stock in SQL instead of calling the Stock API
+--          per request. Enable with STOCK_SOURCE=postgres.
+--
+-- TEMPLATE - not meant to be run as-is. The stock service database is mapped
+-- in through postgres_fdw; every statement below is commented out and uses
+-- <placeholders>. Copy it, fill in the server options, the credentials of a
+-- dedicated read-only stock user and the remote schema/table, then run it.
+-- get_cart reads a relation named public.stock with columns
+-- product_id (UUID) and on_stock (INTEGER). The foreign table is imported into
+-- its own schema (stock_fdw) and exposed as public.stock through either a plain
+-- view (live stock) or a materialized view (snapshot) - create exactly one.
+
+-- CREATE EXTENSION IF NOT EXISTS postgres_fdw;
+--
+-- CREATE SERVER IF NOT EXISTS stock_srv
+--     FOREIGN DATA WRAPPER postgres_fdw
+--     OPTIONS (host '<stock_db_host>', port '<stock_db_port>', dbname '<stock_db_name>');
+--
+-- CREATE USER MAPPING IF NOT EXISTS FOR CURRENT_USER
+--     SERVER stock_srv
+--     OPTIONS (user '<stock_db_user>', password '<stock_db_password>');
+--
+-- -- Import the remote stock table as stock_fdw.stock
+-- CREATE SCHEMA IF NOT EXISTS stock_fdw;
+-- IMPORT FOREIGN SCHEMA <remote_schema> LIMIT TO (stock)
+--     FROM SERVER stock_srv INTO stock_fdw;
+
+-- Option 1: live stock, every get_cart queries the stock database
+--
+-- CREATE VIEW public.stock AS
+--     SELECT product_id, on_stock FROM stock_fdw.stock;
+
+-- Option 2: if the stock database is slow to query, materialize a local
+-- snapshot instead and refresh it on demand:
+--
+-- CREATE MATERIALIZED VIEW public.stock AS
+--     SELECT product_id, on_stock FROM stock_fdw.stock;
+-- CREATE UNIQUE INDEX ON public.stock(product_id);
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY public.stock;